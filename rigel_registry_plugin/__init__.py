@@ -1,5 +1,5 @@
 from . import registries  # noqa: F401
-from .plugin import Plugin  # noqa: F401
+from .plugin import Plugin, run_many  # noqa: F401
 from .exceptions import (  # noqa: F401
     AWSBotoError
 )
@@ -1,8 +1,22 @@
+import docker
+import os
+from concurrent.futures import ThreadPoolExecutor
 from rigel_registry_plugin.registries import ECRPlugin, GenericDockerRegistryPlugin
 from rigelcore.clients import DockerClient
+from rigelcore.exceptions import DockerAPIError
 from rigelcore.loggers import MessageLogger
 from rigelcore.models import ModelBuilder
-from typing import Any, Type
+from typing import Any, Dict, Iterable, Optional, Type
+
+# Docker image registries that require a dedicated plugin.
+# All other registries are handled by GenericDockerRegistryPlugin.
+_REGISTRY_PLUGINS: Dict[str, Type] = {
+    'ecr': ECRPlugin
+}
+
+# Default maximum number of Docker images pushed simultaneously by 'run_many'.
+# Matches the default 'max-concurrent-uploads' setting of the Docker daemon.
+DEFAULT_MAX_CONCURRENT_UPLOADS = 5
 
 
 class Plugin:
@@ -26,20 +40,34 @@ class Plugin:
         self.kwargs: Any = kwargs
 
         registry_name = kwargs.get('registry') or ''  # defaults to DockerHub
-
-        if registry_name == 'ecr':
-            self.plugin_type = ECRPlugin
-        else:
-            self.plugin_type = GenericDockerRegistryPlugin
+        self.plugin_type = _REGISTRY_PLUGINS.get(registry_name.lower(), GenericDockerRegistryPlugin)
 
         # Inject complex fields.
-        self.kwargs['docker_client'] = DockerClient()
+        self.kwargs['docker_client'] = self._create_docker_client()
         self.kwargs['logger'] = MessageLogger()
 
         # Build an instance of the specified plugin.
         builder = ModelBuilder(self.plugin_type)
         self.plugin = builder.build(self.args, self.kwargs)
 
+    def _create_docker_client(self) -> DockerClient:
+        """
+        Create a Docker client.
+        The Docker API version is negotiated with the Docker daemon,
+        unless it is set using environment variable DOCKER_API_VERSION.
+
+        :rtype: rigelcore.clients.DockerClient
+        :return: The Docker client.
+        """
+        version = os.environ.get('DOCKER_API_VERSION')
+        if not version:
+            return DockerClient()
+
+        try:
+            return DockerClient(docker.from_env(version=version))
+        except docker.errors.DockerException as exception:
+            raise DockerAPIError(exception=exception)
+
     def run(self) -> None:
         """
         Delegate execution to adequate plugin.
@@ -51,3 +79,22 @@ class Plugin:
         Delegate resources cleanup to adequate plugin.
         """
         self.plugin.stop()
+
+
+def run_many(plugins: Iterable[Plugin], max_workers: Optional[int] = None) -> None:
+    """
+    Run several plugins concurrently.
+    Plugins authenticating with the same credentials share a single authentication token.
+
+    :type plugins: Iterable[Plugin]
+    :param plugins: The plugins to run.
+    :type max_workers: Optional[int]
+    :param max_workers: Maximum number of plugins running simultaneously.
+    Defaults to the value of environment variable RIGEL_MAX_CONCURRENT_UPLOADS (5 if undeclared).
+    """
+    if max_workers is None:
+        max_workers = int(os.environ.get('RIGEL_MAX_CONCURRENT_UPLOADS', DEFAULT_MAX_CONCURRENT_UPLOADS))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Consume all results so that errors raised by any plugin are propagated.
+        list(executor.map(lambda plugin: plugin.run(), plugins))
@@ -1,14 +1,133 @@
-import base64
+import binascii
+import docker
+import functools
+import hashlib
+import json
 import os
-from boto3 import client as aws_client
-from boto3.exceptions import Boto3Error
-from botocore.exceptions import BotoCoreError
+import tempfile
+import threading
+import time
 from rigel_registry_plugin.exceptions import AWSBotoError
-from pydantic import BaseModel, PrivateAttr
+from pydantic import BaseModel, PrivateAttr, validator
+from rigel_registry_plugin.registries.utils import validate_docker_image_name
 from rigelcore.clients import DockerClient
-from rigelcore.exceptions import UndeclaredEnvironmentVariableError
+from rigelcore.exceptions import DockerAPIError, UndeclaredEnvironmentVariableError
 from rigelcore.loggers import MessageLogger
-from typing import Any
+from typing import Any, Dict, Optional, Tuple, Type
+
+# Directory where AWS ECR authentication tokens are cached if the system keyring is not used.
+ECR_TOKEN_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.rigel', 'ecr')
+
+# System keyring service under which AWS ECR authentication tokens are cached.
+ECR_TOKEN_KEYRING_SERVICE = 'rigel-ecr'
+
+# Environment variable that must be set to '1' or 'true' to cache AWS ECR authentication tokens in the system keyring.
+ECR_TOKEN_KEYRING_ENV = 'RIGEL_ECR_USE_KEYRING'
+
+# Cached authentication tokens are discarded this many seconds before they expire.
+ECR_TOKEN_EXPIRATION_MARGIN = 900
+
+# Errors raised by missing, unwritable or corrupted cache entries.
+_CACHE_ERRORS: Tuple[Type[Exception], ...] = (OSError, ValueError, KeyError, TypeError)
+
+# Serializes the acquisition of ECR authentication tokens among concurrent plugins.
+_token_lock = threading.Lock()
+
+# ECR authentication tokens already acquired by this process and their expiration dates, by cache key.
+_acquired_tokens: Dict[str, Tuple[str, float]] = {}
+
+
+def _get_acquired_token(cache_key: str) -> Optional[str]:
+    """
+    Retrieve an ECR authentication token already acquired by this process.
+
+    :type cache_key: string
+    :param cache_key: The cache key.
+    :rtype: Optional[string]
+    :return: The token if acquired and not about to expire. None otherwise.
+    """
+    acquired_token = _acquired_tokens.get(cache_key)
+    if acquired_token is not None and time.time() < acquired_token[1] - ECR_TOKEN_EXPIRATION_MARGIN:
+        return acquired_token[0]
+    return None
+
+
+def _get_keyring() -> Optional[Any]:
+    """
+    Retrieve the system keyring where ECR authentication tokens are cached.
+    The system keyring is only used if enabled with environment variable RIGEL_ECR_USE_KEYRING,
+    since some backends prompt the user to unlock them.
+
+    :rtype: Optional[keyring.backend.KeyringBackend]
+    :return: The system keyring if enabled, installed and usable. None otherwise.
+    """
+    if os.environ.get(ECR_TOKEN_KEYRING_ENV, '').lower() not in ('1', 'true'):
+        return None
+
+    try:
+        import keyring
+    except ImportError:  # optional dependency
+        return None
+
+    backend = keyring.get_keyring()
+    if backend.priority <= 0:  # no usable backend (e.g. headless machines)
+        return None
+    return backend
+
+
+def _is_authentication_error(error: DockerAPIError) -> bool:
+    """
+    Check if a Docker API error was caused by the registry rejecting the login credentials.
+
+    :type error: rigelcore.exceptions.DockerAPIError
+    :param error: The Docker API error.
+    :rtype: bool
+    :return: True if the Docker daemon answered with status 401 (Unauthorized). False otherwise.
+    """
+    exception = error.kwargs.get('exception')
+    return isinstance(exception, docker.errors.APIError) and exception.status_code == 401
+
+
+def _get_cache_errors(keyring: Optional[Any]) -> Tuple[Type[Exception], ...]:
+    """
+    Retrieve the errors that may be raised while accessing the ECR authentication token cache.
+
+    :type keyring: Optional[keyring.backend.KeyringBackend]
+    :param keyring: The system keyring where tokens are cached, if any.
+    :rtype: Tuple[Type[Exception], ...]
+    :return: The cache errors.
+    """
+    if keyring is None:
+        return _CACHE_ERRORS
+
+    from keyring.errors import KeyringError
+    return _CACHE_ERRORS + (KeyringError,)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_ecr_client(region: str, access_key: str, secret_access_key: str) -> Any:
+    """
+    Retrieve a client for AWS ECR.
+    Clients are reused since creating them is expensive.
+
+    :type region: string
+    :param region: AWS region.
+    :type access_key: string
+    :param access_key: AWS access key.
+    :type secret_access_key: string
+    :param secret_access_key: AWS secret access key.
+    :rtype: botocore.client.ECR
+    :return: The AWS ECR client.
+    """
+    # Package 'boto3' is only imported when required since it is slow to load.
+    from boto3 import client as aws_client
+
+    return aws_client(
+        'ecr',
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_access_key,
+        region_name=region
+    )
 
 
 class AWSCredentials(BaseModel):
@@ -58,15 +177,34 @@ class ECRPlugin(BaseModel):
     local_image: str = 'rigel:temp'
     user: str = 'AWS'
 
+    # List of field validators.
+    _validate_image = validator('image', allow_reuse=True)(validate_docker_image_name)
+
     # List of private fields.
+    _access_key: str = PrivateAttr()
     _complete_image_name: str = PrivateAttr()
     _docker_client: DockerClient = PrivateAttr()
     _logger: MessageLogger = PrivateAttr()
     _registry: str = PrivateAttr()
+    _secret_access_key: str = PrivateAttr()
     _token: str = PrivateAttr()
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
 
+        def __get_env_var_value(env: str) -> str:
+            """
+            Retrieve a value stored in an environment variable.
+
+            :type env: string
+            :param env: Name of environment variable.
+            :rtype: string
+            :return: The value of the environment variable.
+            """
+            value = os.environ.get(env)
+            if value is None:
+                raise UndeclaredEnvironmentVariableError(env=env)
+            return value
+
         self._docker_client = kwargs.pop('docker_client')
         self._logger = kwargs.pop('logger')
 
@@ -75,6 +213,10 @@ class ECRPlugin(BaseModel):
         self._registry = f"{kwargs['account']}.dkr.ecr.{kwargs['region']}.amazonaws.com"
         self._complete_image_name = f"{self._registry}/{self.image}"
 
+        # Resolve AWS credentials only once.
+        self._access_key = __get_env_var_value(self.credentials.access_key)
+        self._secret_access_key = __get_env_var_value(self.credentials.secret_access_key)
+
     def tag(self) -> None:
         """
         Tag existent Docker image to the desired tag.
@@ -88,39 +230,167 @@ class ECRPlugin(BaseModel):
         """
         Authenticate with AWS ECR.
         """
-        def __get_env_var_value(env: str) -> str:
-            """
-            Retrieve a value stored in an environment variable.
+        cache_key = self._get_token_cache_key()
 
-            :type env: string
-            :param env: Name of environment variable.
-            :rtype: string
-            :return: The value of the environment variable.
-            """
-            value = os.environ.get(env)
-            if value is None:
-                raise UndeclaredEnvironmentVariableError(env=env)
-            return value
+        # Reuse a previously cached ECR authentication token if still valid.
+        self._token, cached = self._acquire_token(cache_key)
+        if cached:
+            try:
+                self._docker_client.login(self._registry, self.user, self._token)
+                return
+            except DockerAPIError as error:
+                if not _is_authentication_error(error):
+                    raise  # e.g. unreachable Docker daemon, the cached token may still be valid
+                # The cached token was rejected. Discard it and request a new one.
+                self._token, _ = self._acquire_token(cache_key, refresh=True)
+
+        # Authenticate with AWS ECR.registry
+        self._docker_client.login(self._registry, self.user, self._token)
+
+    def _acquire_token(self, cache_key: str, refresh: bool = False) -> Tuple[str, bool]:
+        """
+        Retrieve an ECR authentication token, either from cache or from AWS.
+
+        :type cache_key: string
+        :param cache_key: The cache key.
+        :type refresh: bool
+        :param refresh: Ignore any cached token and request a new one.
+        :rtype: Tuple[string, bool]
+        :return: The decoded token and whether it was retrieved from cache.
+        """
+        # Tokens already acquired by this process are shared without locking.
+        if not refresh:
+            acquired_token = _get_acquired_token(cache_key)
+            if acquired_token is not None:
+                return acquired_token, True
+
+        # Plugins running concurrently with the same credentials must share a single token.
+        with _token_lock:
 
+            if refresh:
+                _acquired_tokens.pop(cache_key, None)
+                self._remove_cached_token(cache_key)
+            else:
+
+                # Another plugin may have acquired a token while waiting for the lock.
+                acquired_token = _get_acquired_token(cache_key)
+                if acquired_token is not None:
+                    return acquired_token, True
+
+                cached_token = self._load_cached_token(cache_key)
+                if cached_token is not None:
+                    _acquired_tokens[cache_key] = cached_token
+                    return cached_token[0], True
+
+            # Boto is only loaded once no cached token is available.
+            from boto3.exceptions import Boto3Error
+            from botocore.exceptions import BotoCoreError
+
+            try:
+
+                # Obtain ECR authentication token.
+                aws_ecr = _get_ecr_client(self.region, self._access_key, self._secret_access_key)
+
+                # Decode ECR authentication token (formatted as 'user:password').
+                authorization_data = aws_ecr.get_authorization_token()['authorizationData'][0]
+                encoded_token = authorization_data['authorizationToken']
+                _, _, password = binascii.a2b_base64(encoded_token).partition(b':')
+                token = password.decode('ascii')
+
+            except (Boto3Error, BotoCoreError) as exception:
+                raise AWSBotoError(exception=exception)
+
+            expires_at = authorization_data.get('expiresAt')
+            if expires_at is not None:
+                _acquired_tokens[cache_key] = (token, expires_at.timestamp())
+                self._store_cached_token(cache_key, token, expires_at.timestamp())
+
+            return token, False
+
+    def _get_token_cache_key(self) -> str:
+        """
+        Retrieve the key under which the ECR authentication token is cached.
+
+        :rtype: string
+        :return: The cache key.
+        """
+        key = f'{self.account}:{self.region}:{self._access_key}'.encode('utf-8')
+        return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+    def _load_cached_token(self, cache_key: str) -> Optional[Tuple[str, float]]:
+        """
+        Retrieve a cached ECR authentication token.
+
+        :type cache_key: string
+        :param cache_key: The cache key.
+        :rtype: Optional[Tuple[string, float]]
+        :return: The cached token and its expiration date if existent and not about to expire. None otherwise.
+        """
+        keyring = _get_keyring()
         try:
+            if keyring is not None:
+                content = keyring.get_password(ECR_TOKEN_KEYRING_SERVICE, cache_key)
+            else:
+                with open(os.path.join(ECR_TOKEN_CACHE_DIR, f'{cache_key}.json'), 'r') as cache_file:
+                    content = cache_file.read()
+            data = json.loads(content)
+            if time.time() < data['expires_at'] - ECR_TOKEN_EXPIRATION_MARGIN:
+                return str(data['token']), float(data['expires_at'])
+        except _get_cache_errors(keyring):  # missing or corrupted cache entry, or unavailable keyring
+            pass
+        return None
 
-            # Obtain ECR authentication token.
-            aws_ecr = aws_client(
-                'ecr',
-                aws_access_key_id=__get_env_var_value(self.credentials.access_key),
-                aws_secret_access_key=__get_env_var_value(self.credentials.secret_access_key),
-                region_name=self.region
-            )
+    def _store_cached_token(self, cache_key: str, token: str, expires_at: float) -> None:
+        """
+        Cache an ECR authentication token.
+        The token is stored in the system keyring if enabled and available
+        and in a file readable only by the current user otherwise.
+        Failing to cache the token is not considered an error.
 
-            # Decode ECR authentication token.
-            encoded_token = aws_ecr.get_authorization_token()['authorizationData'][0]['authorizationToken']
-            self._token = base64.b64decode(encoded_token).replace(b'AWS:', b'').decode('utf-8')
+        :type cache_key: string
+        :param cache_key: The cache key.
+        :type token: string
+        :param token: The decoded ECR authentication token.
+        :type expires_at: float
+        :param expires_at: Token expiration date (seconds since epoch).
+        """
+        content = json.dumps({'token': token, 'expires_at': expires_at})
+        keyring = _get_keyring()
+        try:
+            if keyring is not None:
+                keyring.set_password(ECR_TOKEN_KEYRING_SERVICE, cache_key, content)
+            else:
+                os.makedirs(ECR_TOKEN_CACHE_DIR, mode=0o700, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=ECR_TOKEN_CACHE_DIR)  # readable only by the owner
+                try:
+                    with os.fdopen(fd, 'w') as cache_file:
+                        cache_file.write(content)
+                    os.replace(tmp_path, os.path.join(ECR_TOKEN_CACHE_DIR, f'{cache_key}.json'))
+                except OSError:
+                    # Do not leave partially written cache files behind.
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    raise
+        except _get_cache_errors(keyring):  # unwritable cache directory or unavailable keyring
+            pass
 
-        except (Boto3Error, BotoCoreError) as exception:
-            raise AWSBotoError(exception=exception)
+    def _remove_cached_token(self, cache_key: str) -> None:
+        """
+        Discard a cached ECR authentication token.
 
-        # Authenticate with AWS ECR.registry
-        self._docker_client.login(self._registry, self.user, self._token)
+        :type cache_key: string
+        :param cache_key: The cache key.
+        """
+        keyring = _get_keyring()
+        try:
+            if keyring is not None:
+                keyring.delete_password(ECR_TOKEN_KEYRING_SERVICE, cache_key)
+            else:
+                os.remove(os.path.join(ECR_TOKEN_CACHE_DIR, f'{cache_key}.json'))
+        except _get_cache_errors(keyring):  # missing cache entry or unavailable keyring
+            pass
 
     def deploy(self) -> None:
         """
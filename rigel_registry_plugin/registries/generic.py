@@ -1,5 +1,6 @@
 import os
-from pydantic import BaseModel, PrivateAttr
+from pydantic import BaseModel, PrivateAttr, validator
+from rigel_registry_plugin.registries.utils import validate_docker_image_name
 from rigelcore.clients import DockerClient
 from rigelcore.exceptions import UndeclaredEnvironmentVariableError
 from rigelcore.loggers import MessageLogger
@@ -41,13 +42,32 @@ class GenericDockerRegistryPlugin(BaseModel):
     local_image: str = 'rigel:temp'
     registry: str = ''  # defaults to DockerHub
 
+    # List of field validators.
+    _validate_image = validator('image', allow_reuse=True)(validate_docker_image_name)
+
     # List of private fields.
     _complete_image_name: str = PrivateAttr()
     _docker_client: DockerClient = PrivateAttr()
     _logger: MessageLogger = PrivateAttr()
+    _password: str = PrivateAttr()
+    _username: str = PrivateAttr()
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
 
+        def __get_env_var_value(env: str) -> str:
+            """
+            Retrieve a value stored in an environment variable.
+
+            :type env: string
+            :param env: Name of environment variable.
+            :rtype: string
+            :return: The value of the environment variable.
+            """
+            value = os.environ.get(env)
+            if value is None:
+                raise UndeclaredEnvironmentVariableError(env=env)
+            return value
+
         self._docker_client = kwargs.pop('docker_client')
         self._logger = kwargs.pop('logger')
 
@@ -58,6 +78,10 @@ class GenericDockerRegistryPlugin(BaseModel):
         else:
             self._complete_image_name = self.image
 
+        # Resolve login credentials only once.
+        self._username = __get_env_var_value(self.credentials.username)
+        self._password = __get_env_var_value(self.credentials.password)
+
     def tag(self) -> None:
         """
         Tag existent Docker image to the desired tag.
@@ -71,25 +95,7 @@ class GenericDockerRegistryPlugin(BaseModel):
         """
         Authenticate with the specified Docker image registr.
         """
-        def __get_env_var_value(env: str) -> str:
-            """
-            Retrieve a value stored in an environment variable.
-
-            :type env: string
-            :param env: Name of environment variable.
-            :rtype: string
-            :return: The value of the environment variable.
-            """
-            value = os.environ.get(env)
-            if value is None:
-                raise UndeclaredEnvironmentVariableError(env=env)
-            return value
-
-        self._docker_client.login(
-            self.registry,
-            __get_env_var_value(self.credentials.username),
-            __get_env_var_value(self.credentials.password)
-        )
+        self._docker_client.login(self.registry, self._username, self._password)
 
     def deploy(self) -> None:
         """
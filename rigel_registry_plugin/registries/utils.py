@@ -0,0 +1,23 @@
+import re
+from rigelcore.exceptions import InvalidDockerImageNameError
+
+# Docker image name (path components separated by '/'), optionally followed by a tag.
+DOCKER_IMAGE_NAME_REGEX = re.compile(
+    r'[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*'
+    r'(?:/[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*)*'
+    r'(?::[A-Za-z0-9_][A-Za-z0-9_.-]{0,127})?'
+)
+
+
+def validate_docker_image_name(image: str) -> str:
+    """
+    Ensure that a Docker image name is valid.
+
+    :type image: string
+    :param image: The Docker image name.
+    :rtype: string
+    :return: The Docker image name.
+    """
+    if DOCKER_IMAGE_NAME_REGEX.fullmatch(image) is None:
+        raise InvalidDockerImageNameError(image=image)
+    return image
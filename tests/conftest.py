@@ -0,0 +1,57 @@
+import pytest
+import types
+from rigelcore.clients import DockerClient
+from typing import Any, Mapping
+from unittest.mock import MagicMock, Mock
+
+
+@pytest.fixture
+def docker_mock() -> Mock:
+    """
+    A rigelcore.clients.DockerClient mock with no recorded calls or configured behavior.
+    """
+    return MagicMock(spec_set=DockerClient)
+
+
+@pytest.fixture(scope='class')
+def ecr_plugin_data() -> Mapping[str, Any]:
+    """
+    Base configuration data for rigel_registry_plugin.registries.ECRPlugin instances.
+    This data is shared by all tests in a class and is read-only.
+    """
+    return types.MappingProxyType({
+        'account': 123456789,
+        'credentials': types.MappingProxyType({
+            'access_key': 'TEST_ACCESS_KEY',
+            'secret_access_key': 'TEST_SECRET_ACCESS_KEY'
+        }),
+        'image': 'test_image',
+        'region': 'test_region',
+        'local_image': 'test_local_image',
+        'user': 'test_user',
+
+        # Injected fields.
+        'docker_client': MagicMock(),
+        'logger': MagicMock()
+    })
+
+
+@pytest.fixture(scope='class')
+def generic_plugin_data() -> Mapping[str, Any]:
+    """
+    Base configuration data for rigel_registry_plugin.registries.GenericDockerRegistryPlugin instances.
+    This data is shared by all tests in a class and is read-only.
+    """
+    return types.MappingProxyType({
+        'credentials': types.MappingProxyType({
+            'username': 'TEST_USERNAME',
+            'password': 'TEST_PASSWORD'
+        }),
+        'image': 'test_image',
+        'local_image': 'test_local_image',
+        'registry': 'test_registry',
+
+        # Injected fields.
+        'docker_client': MagicMock(),
+        'logger': MagicMock()
+    })
@@ -1,5 +1,3 @@
-import unittest
-
 from botocore.exceptions import BotoCoreError
 from boto3.exceptions import Boto3Error
 from rigelcore import RigelError
@@ -8,7 +6,7 @@ from rigel_registry_plugin.exceptions import (
 )
 
 
-class ExceptionTesting(unittest.TestCase):
+class ExceptionTesting:
     """
     Test suite for all classes under ecr_rigel_plugin.exceptions.
     """
@@ -20,9 +18,9 @@ class ExceptionTesting(unittest.TestCase):
         """
         test_exception = BotoCoreError()
         err = AWSBotoError(exception=test_exception)
-        self.assertEqual(err.kwargs['exception'], test_exception)
-        self.assertEqual(err.code, 50)
-        self.assertTrue(isinstance(err, RigelError))
+        assert err.kwargs['exception'] == test_exception
+        assert err.code == 50
+        assert isinstance(err, RigelError)
 
     def test_aws_boto3_error(self) -> None:
         """
@@ -31,10 +29,6 @@ class ExceptionTesting(unittest.TestCase):
         """
         test_exception = Boto3Error()
         err = AWSBotoError(exception=test_exception)
-        self.assertEqual(err.kwargs['exception'], test_exception)
-        self.assertEqual(err.code, 50)
-        self.assertTrue(isinstance(err, RigelError))
-
-
-if __name__ == '__main__':
-    unittest.main()
+        assert err.kwargs['exception'] == test_exception
+        assert err.code == 50
+        assert isinstance(err, RigelError)
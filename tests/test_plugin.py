@@ -1,70 +1,96 @@
+import base64
+import datetime
+import docker
 import inspect
-import unittest
-from rigel_registry_plugin import Plugin
+import pathlib
+import pytest
+import time
+from rigel_registry_plugin import plugin as plugin_module
+from rigel_registry_plugin import Plugin, run_many
+from rigel_registry_plugin.plugin import DEFAULT_MAX_CONCURRENT_UPLOADS
+from rigel_registry_plugin.registries import ecr as ecr_module
 from rigel_registry_plugin.registries import (
     ECRPlugin,
     GenericDockerRegistryPlugin
 )
+from rigelcore.exceptions import DockerAPIError
+from typing import Any, Dict, Iterator, Mapping
 from unittest.mock import MagicMock, Mock, patch
 
 
-class PluginTesting(unittest.TestCase):
+class PluginTesting:
     """
     Test suite for the rigel_registry_plugin.Plugin class.
     """
 
+    @pytest.fixture(autouse=True)
+    def builder_mock(self) -> Iterator[Mock]:
+        """
+        Mock the creation of plugin instances.
+        """
+        with patch.object(plugin_module, 'ModelBuilder') as builder_mock:
+            yield builder_mock
+
+    @pytest.fixture(autouse=True)
+    def docker_client_mock(self) -> Iterator[Mock]:
+        """
+        Mock the creation of Docker clients.
+        """
+        with patch.object(plugin_module, 'DockerClient') as docker_client_mock:
+            yield docker_client_mock
+
     def test_run_compliant(self) -> None:
         """
         Ensure that Plugin class has required 'run' functions.
         """
-        self.assertTrue('run' in Plugin.__dict__)
+        assert 'run' in Plugin.__dict__
 
         run_signature = inspect.signature(Plugin.run)
-        self.assertEqual(len(run_signature.parameters), 1)
+        assert len(run_signature.parameters) == 1
 
     def test_stop_compliant(self) -> None:
         """
         Ensure that Plugin class has required 'stop' function.
         """
-        self.assertTrue('stop' in Plugin.__dict__)
+        assert 'stop' in Plugin.__dict__
 
         stop_signature = inspect.signature(Plugin.stop)
-        self.assertEqual(len(stop_signature.parameters), 1)
+        assert len(stop_signature.parameters) == 1
 
-    @patch('rigel_registry_plugin.plugin.DockerClient')
-    @patch('rigel_registry_plugin.plugin.ModelBuilder')
-    def test_ecr_plugin_choice(self, builder_mock: Mock, docker_mock: Mock) -> None:
+    def test_ecr_plugin_choice(self) -> None:
         """
         Ensure that plugin type rigel_registry_plugin.registries.ECRPlugin
         is selected if 'ecr' is specified.
         """
         plugin = Plugin(*[], **{'registry': 'ecr'})
-        self.assertEqual(plugin.plugin_type, ECRPlugin)
+        assert plugin.plugin_type == ECRPlugin
 
-    @patch('rigel_registry_plugin.plugin.DockerClient')
-    @patch('rigel_registry_plugin.plugin.ModelBuilder')
-    def test_generic_plugin_choice_gitlab(self, builder_mock: Mock, docker_mock: Mock) -> None:
+    def test_ecr_plugin_choice_case_insensitive(self) -> None:
+        """
+        Ensure that plugin type rigel_registry_plugin.registries.ECRPlugin
+        is selected regardless of the case used to specify 'ecr'.
+        """
+        plugin = Plugin(*[], **{'registry': 'ECR'})
+        assert plugin.plugin_type == ECRPlugin
+
+    def test_generic_plugin_choice_gitlab(self) -> None:
         """
         Ensure that plugin type rigel_registry_plugin.registries.GenericDockerRegistryPlugin
         is selected if 'gitlab' is specified.
         """
         plugin = Plugin(*[], **{'registry': 'gitlab'})
-        self.assertEqual(plugin.plugin_type, GenericDockerRegistryPlugin)
+        assert plugin.plugin_type == GenericDockerRegistryPlugin
 
-    @patch('rigel_registry_plugin.plugin.DockerClient')
-    @patch('rigel_registry_plugin.plugin.ModelBuilder')
-    def test_generic_plugin_choice_dockerhub(self, builder_mock: Mock, docker_mock: Mock) -> None:
+    def test_generic_plugin_choice_dockerhub(self) -> None:
         """
         Ensure that plugin type rigel_registry_plugin.registries.GenericDockerRegistryPlugin
         is selected if 'dockerhub' is specified.
         """
         plugin = Plugin(*[], **{'registry': 'dockerhub'})
-        self.assertEqual(plugin.plugin_type, GenericDockerRegistryPlugin)
+        assert plugin.plugin_type == GenericDockerRegistryPlugin
 
     @patch('rigel_registry_plugin.plugin.MessageLogger')
-    @patch('rigel_registry_plugin.plugin.DockerClient')
-    @patch('rigel_registry_plugin.plugin.ModelBuilder')
-    def test_plugin_initialization(self, builder_mock: Mock, docker_mock: Mock, logger_mock: Mock) -> None:
+    def test_plugin_initialization(self, logger_mock: Mock, builder_mock: Mock) -> None:
         """
         Ensure that creation of plugin instances works as expected.
         """
@@ -83,9 +109,55 @@ class PluginTesting(unittest.TestCase):
         builder_mock.assert_called_once_with(plugin.plugin_type)
         plugin_instance_mock.build.assert_called_once_with(tuple(test_args), test_kwargs)
 
-    @patch('rigel_registry_plugin.plugin.DockerClient')
-    @patch('rigel_registry_plugin.plugin.ModelBuilder')
-    def test_plugin_run_function_call(self, builder_mock: Mock, docker_mock: Mock) -> None:
+    @patch('rigel_registry_plugin.plugin.docker.from_env')
+    def test_docker_api_version_negotiation(
+        self,
+        from_env_mock: Mock,
+        docker_client_mock: Mock,
+        monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Ensure that the Docker API version is negotiated if environment variable DOCKER_API_VERSION is undeclared.
+        """
+        monkeypatch.delenv('DOCKER_API_VERSION', raising=False)
+
+        Plugin(*[], **{})
+
+        from_env_mock.assert_not_called()
+        docker_client_mock.assert_called_once_with()
+
+    @patch('rigel_registry_plugin.plugin.docker.from_env')
+    def test_docker_api_version_pinning(
+        self,
+        from_env_mock: Mock,
+        docker_client_mock: Mock,
+        monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Ensure that the Docker API version set with environment variable DOCKER_API_VERSION is used.
+        """
+        monkeypatch.setenv('DOCKER_API_VERSION', '1.41')
+
+        Plugin(*[], **{})
+
+        from_env_mock.assert_called_once_with(version='1.41')
+        docker_client_mock.assert_called_once_with(from_env_mock.return_value)
+
+    @patch('rigel_registry_plugin.plugin.docker.from_env')
+    def test_docker_api_error(self, from_env_mock: Mock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Ensure that DockerAPIError is thrown if the Docker client can not be created.
+        """
+        test_exception = docker.errors.DockerException()
+
+        monkeypatch.setenv('DOCKER_API_VERSION', '1.41')
+        from_env_mock.side_effect = test_exception
+
+        with pytest.raises(DockerAPIError) as context:
+            Plugin(*[], **{})
+        assert context.value.kwargs['exception'] == test_exception
+
+    def test_plugin_run_function_call(self, builder_mock: Mock) -> None:
         """
         Ensure that execution is properly delegated to the 'run' function of the selected plugin.
         """
@@ -100,9 +172,7 @@ class PluginTesting(unittest.TestCase):
 
         plugin_mock.run.assert_called_once()
 
-    @patch('rigel_registry_plugin.plugin.DockerClient')
-    @patch('rigel_registry_plugin.plugin.ModelBuilder')
-    def test_plugin_stop_function_call(self, builder_mock: Mock, docker_mock: Mock) -> None:
+    def test_plugin_stop_function_call(self, builder_mock: Mock) -> None:
         """
         Ensure that execution is properly delegated to the 'stop' function of the selected plugin.
         """
@@ -118,5 +188,95 @@ class PluginTesting(unittest.TestCase):
         plugin_mock.stop.assert_called_once()
 
 
-if __name__ == '__main__':
-    unittest.main()
+class RunManyTesting:
+    """
+    Test suite for the rigel_registry_plugin.run_many function.
+    """
+
+    def test_run_many_function_call(self) -> None:
+        """
+        Ensure that all plugins are run.
+        """
+        plugins = [MagicMock() for _ in range(3)]
+        run_many(plugins)
+
+        for plugin in plugins:
+            plugin.run.assert_called_once()
+
+    def test_run_many_error_propagation(self) -> None:
+        """
+        Ensure that errors raised by any plugin are propagated.
+        """
+        test_exception = Exception()
+
+        failing_plugin = MagicMock()
+        failing_plugin.run.side_effect = test_exception
+
+        with pytest.raises(Exception) as context:
+            run_many([MagicMock(), failing_plugin])
+        assert context.value == test_exception
+
+    @patch('rigel_registry_plugin.plugin.ThreadPoolExecutor')
+    def test_run_many_max_workers(self, executor_mock: Mock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Ensure that the maximum number of concurrent plugins is read
+        from environment variable RIGEL_MAX_CONCURRENT_UPLOADS.
+        """
+        monkeypatch.setenv('RIGEL_MAX_CONCURRENT_UPLOADS', '2')
+
+        run_many([])
+        executor_mock.assert_called_once_with(max_workers=2)
+
+    @patch('rigel_registry_plugin.plugin.ThreadPoolExecutor')
+    def test_run_many_default_max_workers(self, executor_mock: Mock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Ensure that at most DEFAULT_MAX_CONCURRENT_UPLOADS plugins run concurrently
+        if environment variable RIGEL_MAX_CONCURRENT_UPLOADS is undeclared.
+        """
+        monkeypatch.delenv('RIGEL_MAX_CONCURRENT_UPLOADS', raising=False)
+
+        run_many([])
+        executor_mock.assert_called_once_with(max_workers=DEFAULT_MAX_CONCURRENT_UPLOADS)
+
+    def test_run_many_shared_ecr_token(
+        self,
+        ecr_plugin_data: Mapping[str, Any],
+        docker_mock: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """
+        Ensure that AWS ECR plugins run concurrently with the same credentials
+        share a single authentication token.
+        """
+        auth_response = {
+            'authorizationData': [
+                {
+                    'authorizationToken': base64.b64encode(b'AWS:test_token'),
+                    'expiresAt': datetime.datetime.now() + datetime.timedelta(hours=12)
+                }
+            ]
+        }
+
+        def get_authorization_token() -> Dict[str, Any]:
+            time.sleep(0.05)  # let other plugins wait for the token
+            return auth_response
+
+        aws_ecr_mock = MagicMock()
+        aws_ecr_mock.get_authorization_token.side_effect = get_authorization_token
+
+        monkeypatch.setenv('TEST_ACCESS_KEY', 'test_value')
+        monkeypatch.setenv('TEST_SECRET_ACCESS_KEY', 'test_value')
+        monkeypatch.delenv('RIGEL_ECR_USE_KEYRING', raising=False)
+        monkeypatch.setattr(ecr_module, 'ECR_TOKEN_CACHE_DIR', str(tmp_path))
+        monkeypatch.setattr(ecr_module, '_acquired_tokens', {})
+        monkeypatch.setattr(ecr_module, '_get_ecr_client', MagicMock(return_value=aws_ecr_mock))
+
+        test_kwargs = {key: value for key, value in ecr_plugin_data.items() if key not in ('docker_client', 'logger')}
+        with patch.object(plugin_module, 'DockerClient', return_value=docker_mock):
+            plugins = [Plugin(*[], **{**test_kwargs, 'registry': 'ecr'}) for _ in range(4)]
+        run_many(plugins, max_workers=4)
+
+        aws_ecr_mock.get_authorization_token.assert_called_once()
+        assert docker_mock.login.call_count == 4
+        assert docker_mock.push_image.call_count == 4
@@ -1,164 +1,422 @@
 import base64
-import copy
-import unittest
+import datetime
+import docker
+import os
+import pathlib
+import pytest
+import sys
+import threading
+import time
 from botocore.exceptions import BotoCoreError
 from rigel_registry_plugin.exceptions import AWSBotoError
 from rigel_registry_plugin.registries import ECRPlugin
-from rigelcore.exceptions import UndeclaredEnvironmentVariableError
+from rigel_registry_plugin.registries.ecr import _acquired_tokens, _get_ecr_client, _get_keyring
+from rigelcore.exceptions import DockerAPIError, InvalidDockerImageNameError, UndeclaredEnvironmentVariableError
+from typing import Any, Dict, Iterator, Mapping, Tuple
 from unittest.mock import MagicMock, Mock, patch
 
+# AWS ECR authentication token, as returned by AWS (encoded) and as used to login with Docker (decoded).
+_DECODED_TOKEN = 'test_token'
+_ENCODED_TOKEN = base64.b64encode(f'AWS:{_DECODED_TOKEN}'.encode())
 
-class ECRPluginTesting(unittest.TestCase):
+# AWS ECR registry and image URI for the account, region and image declared in the base plugin data.
+_ECR_REGISTRY = '123456789.dkr.ecr.test_region.amazonaws.com'
+_ECR_IMAGE_URI = f'{_ECR_REGISTRY}/test_image'
+
+# Response to a GetAuthorizationToken call without expiration date.
+_AUTH_RESPONSE = {'authorizationData': [{'authorizationToken': _ENCODED_TOKEN}]}
+
+
+def _expiring_auth_response(expires_in: datetime.timedelta) -> Dict[str, Any]:
+    """
+    Build the response to a GetAuthorizationToken call for a token expiring after a given time.
+
+    :type expires_in: datetime.timedelta
+    :param expires_in: Time until the token expires.
+    :rtype: Dict[string, Any]
+    :return: The GetAuthorizationToken response.
+    """
+    return {
+        'authorizationData': [
+            {
+                'authorizationToken': _ENCODED_TOKEN,
+                'expiresAt': datetime.datetime.now() + expires_in
+            }
+        ]
+    }
+
+
+class ECRPluginTesting:
     """
     Test suite for the rigel_registry_plugin.registries.ECRPlugin class.
     """
 
-    base_plugin_data = {
-        'account': 123456789,
-        'credentials': {
-            'access_key': 'TEST_ACCESS_KEY',
-            'secret_access_key': 'TEST_SECRET_ACCESS_KEY'
-        },
-        'image': 'test_image',
-        'region': 'test_region',
-        'local_image': 'test_local_image',
-        'user': 'test_user',
-
-        # Injected fields.
-        'docker_client': MagicMock(),
-        'logger': MagicMock()
-    }
+    @pytest.fixture(autouse=True)
+    def isolate_environment(self, tmp_path: pathlib.Path) -> Iterator[None]:
+        """
+        Declare the AWS credentials and isolate the ECR authentication token and client caches of each test.
+        The system keyring is disabled unless enabled by the test itself.
+        """
+        _acquired_tokens.clear()
+        _get_ecr_client.cache_clear()
+
+        test_environ = {
+            'TEST_ACCESS_KEY': 'test_value',
+            'TEST_SECRET_ACCESS_KEY': 'test_value'
+        }
+        with patch.dict(os.environ, test_environ), \
+                patch('rigel_registry_plugin.registries.ecr.ECR_TOKEN_CACHE_DIR', str(tmp_path)):
+            os.environ.pop('RIGEL_ECR_USE_KEYRING', None)
+            yield
 
-    def test_tag_call(self) -> None:
+    @pytest.fixture
+    def keyring_mock(self) -> Iterator[Mock]:
+        """
+        Enable the system keyring and mock its backend, storing passwords in memory.
+        """
+        keyring = pytest.importorskip('keyring')
+
+        keyring_data: Dict[Tuple[str, str], str] = {}
+        keyring_mock = MagicMock(priority=1)
+        keyring_mock.get_password.side_effect = lambda service, key: keyring_data.get((service, key))
+        keyring_mock.set_password.side_effect = lambda service, key, value: keyring_data.update({(service, key): value})
+        keyring_mock.delete_password.side_effect = lambda service, key: keyring_data.pop((service, key))
+
+        os.environ['RIGEL_ECR_USE_KEYRING'] = '1'
+        with patch.object(keyring, 'get_keyring', return_value=keyring_mock):
+            yield keyring_mock
+
+    @pytest.fixture
+    def aws_client_mock(self) -> Iterator[Mock]:
+        """
+        Mock the creation of AWS clients.
+        """
+        with patch('boto3.client') as aws_client_mock:
+            yield aws_client_mock
+
+    @pytest.fixture
+    def aws_mock(self, aws_client_mock: Mock) -> Mock:
+        """
+        A mock of the AWS ECR client, issuing authentication tokens without expiration date by default.
+        """
+        aws_ecr_mock: Mock = aws_client_mock.return_value
+        aws_ecr_mock.get_authorization_token.return_value = _AUTH_RESPONSE
+        return aws_ecr_mock
+
+    def test_invalid_image_name_error(self, ecr_plugin_data: Mapping[str, Any]) -> None:
+        """
+        Test if InvalidDockerImageNameError is thrown
+        if an invalid Docker image name is specified.
+        """
+        test_data = {**ecr_plugin_data, 'image': 'test_image:test_tag:test_tag'}
+
+        with pytest.raises(InvalidDockerImageNameError) as context:
+            ECRPlugin(*[], **test_data)
+        assert context.value.kwargs['image'] == test_data['image']
+
+    def test_tag_call(self, ecr_plugin_data: Mapping[str, Any], docker_mock: Mock) -> None:
         """
         Test if function 'tag' interfaces as expected with rigelcore.clients.DockerClient.
         """
-        docker_mock = MagicMock()
-        test_data = copy.deepcopy(self.base_plugin_data)
-        test_data['docker_client'] = docker_mock
+        test_data = {**ecr_plugin_data, 'docker_client': docker_mock}
 
         plugin = ECRPlugin(*[], **test_data)
         plugin.tag()
-        docker_mock.tag_image.assert_called_once_with(
-            test_data['local_image'],
-            "{}.dkr.ecr.{}.amazonaws.com/{}".format(
-                test_data['account'],
-                test_data['region'],
-                test_data['image']
-            )
-        )
+        docker_mock.tag_image.assert_called_once_with(test_data['local_image'], _ECR_IMAGE_URI)
 
-    @patch('rigel_registry_plugin.registries.ecr.os.environ.get')
-    def test_undeclared_environment_variable_error(self, environ_mock: Mock) -> None:
+    def test_undeclared_environment_variable_error(self, ecr_plugin_data: Mapping[str, Any]) -> None:
         """
         Test if UndeclaredEnvironmentVariableError is thrown
         if an environment variable was left undeclared.
         """
-        test_access_key = 'test_access_key'
-        test_environ = {'TEST_ACCESS_KEY': test_access_key}
-
-        environ_mock.side_effect = test_environ.get
+        test_environ = {'TEST_ACCESS_KEY': 'test_access_key'}
 
-        with self.assertRaises(UndeclaredEnvironmentVariableError) as context:
-            plugin = ECRPlugin(*[], **self.base_plugin_data)
-            plugin.authenticate()
-        self.assertEqual(context.exception.kwargs['env'], 'TEST_SECRET_ACCESS_KEY')
+        with patch.dict(os.environ, test_environ, clear=True), \
+                pytest.raises(UndeclaredEnvironmentVariableError) as context:
+            ECRPlugin(*[], **ecr_plugin_data)
+        assert context.value.kwargs['env'] == 'TEST_SECRET_ACCESS_KEY'
 
-    @patch('rigel_registry_plugin.registries.ecr.aws_client')
-    @patch('rigel_registry_plugin.registries.ecr.os.environ.get')
-    def test_invalid_credentials_error(self, environ_mock: Mock, aws_mock: Mock) -> None:
+    def test_invalid_credentials_error(self, aws_client_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
         """
         Test if AWSBotoError is thrown
         if an error occurs while making Boto API calls to authenticate.
         """
         test_exception = BotoCoreError()
 
-        environ_mock.return_value = 'test_value'
-        aws_mock.side_effect = test_exception
+        aws_client_mock.side_effect = test_exception
 
-        with self.assertRaises(AWSBotoError) as context:
-            plugin = ECRPlugin(*[], **self.base_plugin_data)
+        with pytest.raises(AWSBotoError) as context:
+            plugin = ECRPlugin(*[], **ecr_plugin_data)
             plugin.authenticate()
-        self.assertEqual(context.exception.kwargs['exception'], test_exception)
+        assert context.value.kwargs['exception'] == test_exception
 
-    @patch('rigel_registry_plugin.registries.ecr.aws_client')
-    @patch('rigel_registry_plugin.registries.ecr.os.environ.get')
-    def test_token_decoding(self, environ_mock: Mock, aws_mock: Mock) -> None:
+    def test_token_decoding(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
         """
         Test if AWS ECR token is properly decoded.
         """
-        environ_mock.return_value = 'test_value'
-
-        decoded_test_token = 'test_token'
-        aws_ecr_mock = MagicMock()
-        aws_ecr_mock.get_authorization_token.return_value = {
-            'authorizationData': [
-                {
-                    'authorizationToken': base64.b64encode(f'AWS:{decoded_test_token}'.encode())
-                }
-            ]
-        }
-        aws_mock.return_value = aws_ecr_mock
-
-        plugin = ECRPlugin(*[], **self.base_plugin_data)
+        plugin = ECRPlugin(*[], **ecr_plugin_data)
         plugin.authenticate()
 
-        self.assertEqual(plugin._token, decoded_test_token)
+        assert plugin._token == _DECODED_TOKEN
 
-    @patch('rigel_registry_plugin.registries.ecr.aws_client')
-    @patch('rigel_registry_plugin.registries.ecr.os.environ.get')
-    def test_authenticate_call(self, environ_mock: Mock, aws_mock: Mock) -> None:
+    def test_authenticate_call(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any], docker_mock: Mock) -> None:
         """
         Test if function 'authenticate' interfaces as expected with rigelcore.clients.DockerClient class.
         """
-        environ_mock.return_value = 'test_value'
-
-        docker_mock = MagicMock()
-        test_data = copy.deepcopy(self.base_plugin_data)
-        test_data['docker_client'] = docker_mock
-
-        decoded_test_token = 'test_token'
-        aws_ecr_mock = MagicMock()
-        aws_ecr_mock.get_authorization_token.return_value = {
-            'authorizationData': [
-                {
-                    'authorizationToken': base64.b64encode(f'AWS:{decoded_test_token}'.encode())
-                }
-            ]
-        }
-        aws_mock.return_value = aws_ecr_mock
+        test_data = {**ecr_plugin_data, 'docker_client': docker_mock}
 
         plugin = ECRPlugin(*[], **test_data)
         plugin.authenticate()
 
         docker_mock.login.assert_called_once_with(
-            "{}.dkr.ecr.{}.amazonaws.com".format(
-                test_data['account'],
-                test_data['region']
-            ),
+            _ECR_REGISTRY,
             test_data['user'],
-            decoded_test_token,
+            _DECODED_TOKEN,
         )
 
-    def test_deploy_tag(self) -> None:
+    def test_cached_token_reuse(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
         """
-        Ensure that 'deploy' function works as expected.
+        Test if a cached AWS ECR token is reused while still valid.
+        """
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(hours=12))
+
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+        _acquired_tokens.clear()  # simulate a new process
+
+        plugin = ECRPlugin(*[], **ecr_plugin_data)
+        plugin.authenticate()
+
+        aws_mock.get_authorization_token.assert_called_once()
+        assert plugin._token == _DECODED_TOKEN
+
+    def test_acquired_token_reuse(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
+        """
+        Test if an AWS ECR token already acquired by the process is reused
+        without reading the persistent cache.
+        """
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(hours=12))
+
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+
+        with patch.object(ECRPlugin, '_load_cached_token') as load_mock:
+            plugin = ECRPlugin(*[], **ecr_plugin_data)
+            plugin.authenticate()
+
+        load_mock.assert_not_called()
+        aws_mock.get_authorization_token.assert_called_once()
+        assert plugin._token == _DECODED_TOKEN
+
+    def test_concurrent_token_acquisition(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
+        """
+        Test if plugins authenticating concurrently with the same credentials
+        share a single AWS ECR token.
+        """
+        n_plugins = 8
+        barrier = threading.Barrier(n_plugins)
+        auth_response = _expiring_auth_response(datetime.timedelta(hours=12))
+
+        def get_authorization_token() -> Dict[str, Any]:
+            time.sleep(0.05)  # let other plugins wait for the token
+            return auth_response
+
+        aws_mock.get_authorization_token.side_effect = get_authorization_token
+
+        plugins = [ECRPlugin(*[], **ecr_plugin_data) for _ in range(n_plugins)]
+
+        def authenticate(plugin: ECRPlugin) -> None:
+            barrier.wait()
+            plugin.authenticate()
+
+        threads = [threading.Thread(target=authenticate, args=(plugin,)) for plugin in plugins]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert aws_mock.get_authorization_token.call_count == 1
+        assert all(plugin._token == _DECODED_TOKEN for plugin in plugins)
+
+    def test_cached_token_expiration(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
+        """
+        Test if a cached AWS ECR token is not reused when about to expire.
+        """
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(minutes=10))
+
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+
+        assert aws_mock.get_authorization_token.call_count == 2
+
+    def test_keyring_cached_token(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any], keyring_mock: Mock) -> None:
+        """
+        Test if AWS ECR tokens are cached in the system keyring if enabled.
         """
-        docker_mock = MagicMock()
-        test_data = copy.deepcopy(self.base_plugin_data)
-        test_data['docker_client'] = docker_mock
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(hours=12))
+
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+        _acquired_tokens.clear()  # simulate a new process
+
+        plugin = ECRPlugin(*[], **ecr_plugin_data)
+        plugin.authenticate()
+
+        aws_mock.get_authorization_token.assert_called_once()
+        keyring_mock.set_password.assert_called_once()
+        assert plugin._token == _DECODED_TOKEN
+
+    def test_keyring_cached_token_rejected(
+        self,
+        aws_mock: Mock,
+        ecr_plugin_data: Mapping[str, Any],
+        docker_mock: Mock,
+        keyring_mock: Mock
+    ) -> None:
+        """
+        Test if an AWS ECR token cached in the system keyring is discarded when rejected.
+        """
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(hours=12))
+
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+        _acquired_tokens.clear()  # simulate a new process
+
+        test_exception = docker.errors.APIError('unauthorized', response=MagicMock(status_code=401))
+        docker_mock.login.side_effect = [DockerAPIError(exception=test_exception), None]
+        test_data = {**ecr_plugin_data, 'docker_client': docker_mock}
 
         plugin = ECRPlugin(*[], **test_data)
-        plugin.deploy()
+        plugin.authenticate()
+
+        cache_key = plugin._get_token_cache_key()
+        keyring_mock.delete_password.assert_called_once_with('rigel-ecr', cache_key)
+        assert keyring_mock.set_password.call_count == 2
+        assert aws_mock.get_authorization_token.call_count == 2
+
+    def test_keyring_disabled(self) -> None:
+        """
+        Test if the system keyring is not used unless enabled with environment variable RIGEL_ECR_USE_KEYRING.
+        """
+        keyring = pytest.importorskip('keyring')
+
+        with patch.object(keyring, 'get_keyring') as get_keyring_mock:
+            assert _get_keyring() is None
+        get_keyring_mock.assert_not_called()
+
+    def test_keyring_not_installed(self) -> None:
+        """
+        Test if the system keyring is not used if package 'keyring' is not installed.
+        """
+        os.environ['RIGEL_ECR_USE_KEYRING'] = '1'
+
+        with patch.dict(sys.modules, {'keyring': None}):  # make 'import keyring' fail
+            assert _get_keyring() is None
+
+    def test_keyring_unusable_backend(self, keyring_mock: Mock) -> None:
+        """
+        Test if the system keyring is not used if no usable backend is available.
+        """
+        keyring_mock.priority = 0
+
+        assert _get_keyring() is None
+
+    def test_keyring_usable_backend(self, keyring_mock: Mock) -> None:
+        """
+        Test if the system keyring is used if enabled and a usable backend is available.
+        """
+        assert _get_keyring() is keyring_mock
+
+    def test_cache_error_propagation(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
+        """
+        Test if unexpected errors raised while accessing the AWS ECR token cache are not silenced.
+        """
+        test_exception = RuntimeError()
 
-        docker_mock.push_image.assert_called_once_with(
-            "{}.dkr.ecr.{}.amazonaws.com/{}".format(
-                test_data['account'],
-                test_data['region'],
-                test_data['image']
-            )
+        with patch('rigel_registry_plugin.registries.ecr.open', side_effect=test_exception, create=True), \
+                pytest.raises(RuntimeError) as context:
+            ECRPlugin(*[], **ecr_plugin_data).authenticate()
+        assert context.value == test_exception
+
+    def test_ecr_client_reuse(self, aws_client_mock: Mock, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any]) -> None:
+        """
+        Test if the AWS ECR client is created only once for the same credentials.
+        """
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+
+        aws_client_mock.assert_called_once_with(
+            'ecr',
+            aws_access_key_id='test_value',
+            aws_secret_access_key='test_value',
+            region_name=ecr_plugin_data['region']
         )
+        assert aws_mock.get_authorization_token.call_count == 2
+
+    def test_cached_token_rejected(self, aws_mock: Mock, ecr_plugin_data: Mapping[str, Any], docker_mock: Mock) -> None:
+        """
+        Test if a new AWS ECR token is requested when the cached token is rejected.
+        """
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(hours=12))
+
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+
+        test_exception = docker.errors.APIError('unauthorized', response=MagicMock(status_code=401))
+        docker_mock.login.side_effect = [DockerAPIError(exception=test_exception), None]
+        test_data = {**ecr_plugin_data, 'docker_client': docker_mock}
+
+        plugin = ECRPlugin(*[], **test_data)
+        plugin.authenticate()
+
+        assert aws_mock.get_authorization_token.call_count == 2
+        assert docker_mock.login.call_count == 2
+
+    def test_cached_token_kept_on_docker_error(
+        self,
+        aws_mock: Mock,
+        ecr_plugin_data: Mapping[str, Any],
+        docker_mock: Mock,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """
+        Test if a cached AWS ECR token is kept when login fails for reasons other than authentication.
+        """
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(hours=12))
 
+        ECRPlugin(*[], **ecr_plugin_data).authenticate()
+
+        test_error = DockerAPIError(exception=docker.errors.DockerException())
+        docker_mock.login.side_effect = test_error
+        test_data = {**ecr_plugin_data, 'docker_client': docker_mock}
+
+        with pytest.raises(DockerAPIError) as context:
+            ECRPlugin(*[], **test_data).authenticate()
+        assert context.value == test_error
+
+        aws_mock.get_authorization_token.assert_called_once()
+        assert len(list(tmp_path.glob('*.json'))) == 1
+
+    def test_cached_token_write_error(
+        self,
+        aws_mock: Mock,
+        ecr_plugin_data: Mapping[str, Any],
+        tmp_path: pathlib.Path
+    ) -> None:
+        """
+        Test if no temporary file is left behind when an AWS ECR token can not be cached.
+        """
+        aws_mock.get_authorization_token.return_value = _expiring_auth_response(datetime.timedelta(hours=12))
+
+        with patch('rigel_registry_plugin.registries.ecr.os.replace', side_effect=OSError()):
+            plugin = ECRPlugin(*[], **ecr_plugin_data)
+            plugin.authenticate()
+
+        assert plugin._token == _DECODED_TOKEN
+        assert list(tmp_path.iterdir()) == []
+
+    def test_deploy_tag(self, ecr_plugin_data: Mapping[str, Any], docker_mock: Mock) -> None:
+        """
+        Ensure that 'deploy' function works as expected.
+        """
+        test_data = {**ecr_plugin_data, 'docker_client': docker_mock}
+
+        plugin = ECRPlugin(*[], **test_data)
+        plugin.deploy()
 
-if __name__ == '__main__':
-    unittest.main()
+        docker_mock.push_image.assert_called_once_with(_ECR_IMAGE_URI)
@@ -1,36 +1,44 @@
-import copy
-import unittest
+import os
+import pytest
 from rigel_registry_plugin.registries import GenericDockerRegistryPlugin
-from rigelcore.exceptions import UndeclaredEnvironmentVariableError
-from unittest.mock import MagicMock, Mock, patch
+from rigelcore.exceptions import InvalidDockerImageNameError, UndeclaredEnvironmentVariableError
+from typing import Any, Iterator, Mapping
+from unittest.mock import Mock, patch
 
 
-class GenericDockerRegistryPluginTesting(unittest.TestCase):
+class GenericDockerRegistryPluginTesting:
     """
     Test suite for the rigel_registry_plugin.registries.GenericDockerRegistryPlugin class.
     """
 
-    base_plugin_data = {
-        'credentials': {
-            'username': 'TEST_USERNAME',
-            'password': 'TEST_PASSWORD'
-        },
-        'image': 'test_image',
-        'local_image': 'test_local_image',
-        'registry': 'test_registry',
+    @pytest.fixture(autouse=True)
+    def declare_credentials(self) -> Iterator[None]:
+        """
+        Declare the login credentials used by each test.
+        """
+        test_environ = {
+            'TEST_USERNAME': 'test_value',
+            'TEST_PASSWORD': 'test_value'
+        }
+        with patch.dict(os.environ, test_environ):
+            yield
+
+    def test_invalid_image_name_error(self, generic_plugin_data: Mapping[str, Any]) -> None:
+        """
+        Test if InvalidDockerImageNameError is thrown
+        if an invalid Docker image name is specified.
+        """
+        test_data = {**generic_plugin_data, 'image': 'test_image:test_tag:test_tag'}
 
-        # Injected fields.
-        'docker_client': MagicMock(),
-        'logger': MagicMock()
-    }
+        with pytest.raises(InvalidDockerImageNameError) as context:
+            GenericDockerRegistryPlugin(*[], **test_data)
+        assert context.value.kwargs['image'] == test_data['image']
 
-    def test_tag_call(self) -> None:
+    def test_tag_call(self, generic_plugin_data: Mapping[str, Any], docker_mock: Mock) -> None:
         """
         Test if function 'tag' interfaces as expected with rigelcore.clients.DockerClient.
         """
-        docker_mock = MagicMock()
-        test_data = copy.deepcopy(self.base_plugin_data)
-        test_data['docker_client'] = docker_mock
+        test_data = {**generic_plugin_data, 'docker_client': docker_mock}
 
         plugin = GenericDockerRegistryPlugin(*[], **test_data)
         plugin.tag()
@@ -39,38 +47,31 @@ class GenericDockerRegistryPluginTesting(unittest.TestCase):
             f"{test_data['registry']}/{test_data['image']}"
         )
 
-    @patch('rigel_registry_plugin.registries.generic.os.environ.get')
-    def test_undeclared_environment_variable_error(self, environ_mock: Mock) -> None:
+    def test_undeclared_environment_variable_error(self, generic_plugin_data: Mapping[str, Any]) -> None:
         """
         Test if UndeclaredEnvironmentVariableError is thrown
         if an environment variable was left undeclared.
         """
-        test_username = 'test_username'
-        test_environ = {'TEST_USERNAME': test_username}
+        test_environ = {'TEST_USERNAME': 'test_username'}
 
-        environ_mock.side_effect = test_environ.get
+        with patch.dict(os.environ, test_environ, clear=True), \
+                pytest.raises(UndeclaredEnvironmentVariableError) as context:
+            GenericDockerRegistryPlugin(*[], **generic_plugin_data)
+        assert context.value.kwargs['env'] == 'TEST_PASSWORD'
 
-        with self.assertRaises(UndeclaredEnvironmentVariableError) as context:
-            plugin = GenericDockerRegistryPlugin(*[], **self.base_plugin_data)
-            plugin.authenticate()
-        self.assertEqual(context.exception.kwargs['env'], 'TEST_PASSWORD')
-
-    @patch('rigel_registry_plugin.registries.generic.os.environ.get')
-    def test_authenticate_call(self, environ_mock: Mock) -> None:
+    def test_authenticate_call(self, generic_plugin_data: Mapping[str, Any], docker_mock: Mock) -> None:
         """
         Test if function 'authenticate' interfaces as expected
         with rigelcore.clients.DockerClient class.
         """
-        docker_mock = MagicMock()
-        test_data = copy.deepcopy(self.base_plugin_data)
-        test_data['docker_client'] = docker_mock
+        test_data = {**generic_plugin_data, 'docker_client': docker_mock}
 
         test_username = 'test_username'
         test_password = 'test_password'
         test_environ = {'TEST_USERNAME': test_username, 'TEST_PASSWORD': test_password}
-        environ_mock.side_effect = test_environ.get
 
-        plugin = GenericDockerRegistryPlugin(*[], **test_data)
+        with patch.dict(os.environ, test_environ):
+            plugin = GenericDockerRegistryPlugin(*[], **test_data)
         plugin.authenticate()
         docker_mock.login.assert_called_once_with(
             test_data['registry'],
@@ -78,20 +79,14 @@ class GenericDockerRegistryPluginTesting(unittest.TestCase):
             test_password
         )
 
-    def test_push_call(self) -> None:
+    def test_push_call(self, generic_plugin_data: Mapping[str, Any], docker_mock: Mock) -> None:
         """
         Test if function 'deploy' interfaces as expected with rigelcore.clients.DockerClient.
         """
-        docker_mock = MagicMock()
-        test_data = copy.deepcopy(self.base_plugin_data)
-        test_data['docker_client'] = docker_mock
+        test_data = {**generic_plugin_data, 'docker_client': docker_mock}
 
         plugin = GenericDockerRegistryPlugin(*[], **test_data)
         plugin.deploy()
         docker_mock.push_image.assert_called_once_with(
             f"{test_data['registry']}/{test_data['image']}"
         )
-
-
-if __name__ == '__main__':
-    unittest.main()
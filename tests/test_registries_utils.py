@@ -0,0 +1,40 @@
+import pytest
+from rigel_registry_plugin.registries.utils import validate_docker_image_name
+from rigelcore.exceptions import InvalidDockerImageNameError
+
+
+class UtilsTesting:
+    """
+    Test suite for all functions under rigel_registry_plugin.registries.utils.
+    """
+
+    def test_valid_docker_image_names(self) -> None:
+        """
+        Ensure that valid Docker image names are accepted.
+        """
+        for image in [
+            'image',
+            'image:tag',
+            'organization/image',
+            'organization/sub_group/image-name:1.0.2',
+            'image__name:Tag_1.0-rc1'
+        ]:
+            assert validate_docker_image_name(image) == image
+
+    def test_invalid_docker_image_names(self) -> None:
+        """
+        Ensure that InvalidDockerImageNameError is thrown for invalid Docker image names.
+        """
+        for image in [
+            '',
+            'Image',
+            'image:',
+            'image:tag:tag',
+            '/image',
+            'image/',
+            'image:-tag',
+            'image@sha256:' + 64 * 'a'
+        ]:
+            with pytest.raises(InvalidDockerImageNameError) as context:
+                validate_docker_image_name(image)
+            assert context.value.kwargs['image'] == image